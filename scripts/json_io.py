@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Shared JSON read/write helpers for the inventory merge and normalization scripts.
+
+orjson is used when it is installed and the stdlib json module otherwise.
+orjson always writes UTF-8; on the stdlib path, ensure_ascii selects between
+\\u escapes (the json.dump default) and raw UTF-8, so each script keeps the
+output it had before switching to these helpers.
+"""
+
+import json
+from pathlib import Path
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def load_json(path):
+    """Parse a JSON file from one binary read, using orjson when it is installed.
+
+    Both parsers get the raw bytes, so the locale encoding never applies.
+    """
+    raw = Path(path).read_bytes()
+    return orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+
+
+def dump_json(obj, path, compact=False, ensure_ascii=True):
+    """Write the dict obj as indent=2 (or compact) JSON, using orjson when it is installed."""
+    if not HAS_ORJSON:
+        # json.dump makes many small writes; a 64KB buffer batches them
+        with open(path, "w", encoding="utf-8", buffering=1 << 16) as f:
+            if compact:
+                json.dump(obj, f, separators=(",", ":"), ensure_ascii=ensure_ascii)
+            else:
+                json.dump(obj, f, indent=2, ensure_ascii=ensure_ascii)
+        return
+
+    # orjson.dumps builds the whole document as one bytes object, so encode
+    # top-level values one at a time and a "models" list one record at a
+    # time. Output is byte-identical to orjson.dumps(obj, opt).
+    if compact:
+        opt, nl, kv = 0, b"", b":"
+    else:
+        opt, nl, kv = orjson.OPT_INDENT_2, b"\n", b": "
+    with open(path, "wb") as f:
+        f.write(b"{")
+        sep = nl + b"  " if nl else b""
+        for key, value in obj.items():
+            f.write(sep)
+            sep = b"," + nl + b"  " if nl else b","
+            f.write(orjson.dumps(key) + kv)
+            if key == "models" and isinstance(value, list) and value:
+                item_sep = b"[" + nl + b"    " if nl else b"["
+                for m in value:
+                    f.write(item_sep)
+                    item_sep = b"," + nl + b"    " if nl else b","
+                    f.write(orjson.dumps(m, option=opt).replace(b"\n", b"\n    "))
+                f.write(b"\n  ]" if nl else b"]")
+            else:
+                f.write(orjson.dumps(value, option=opt).replace(b"\n", b"\n  "))
+        f.write(b"\n}" if obj and nl else b"}")
+
+
+def dump_json_streaming(envelope, models, path, ensure_ascii=True):
+    """
+    Write {**envelope, "models": [...]} as indent=2 JSON, one model at a time.
+
+    Same bytes as dumping the assembled dict, but `models` can be a generator,
+    so neither the list of records nor the whole serialized document ever has
+    to exist in memory.
+    """
+    if HAS_ORJSON:
+        def dumps(obj):
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    else:
+        def dumps(obj):
+            return json.dumps(obj, indent=2, ensure_ascii=ensure_ascii)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps(envelope)[:-2])  # drop closing "\n}"
+        f.write(',\n  "models": [')
+        sep = "\n    "
+        for m in models:
+            f.write(sep)
+            f.write(dumps(m).replace("\n", "\n    "))
+            sep = ",\n    "
+        f.write("]\n}" if sep == "\n    " else "\n  ]\n}")
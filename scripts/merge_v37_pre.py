@@ -18,6 +18,8 @@ import statistics
 from collections import Counter
 from pathlib import Path
 
+from json_io import dump_json_streaming
+
 BASE = Path("/Users/mv/Documents/research/data/verified")
 UI_DIR = Path("/Users/mv/Documents/research/data/ui")
 
@@ -27,6 +29,13 @@ UTIL_FILE = BASE / "v3-6_utilities_sector_deep_dive_2026-02-12.json"
 OUTPUT_FILE = BASE / "v3-7_normalized_2026-02-12.json"
 UI_OUTPUT = UI_DIR / "models.json"
 
+# source_batch labels assigned to the new cards by normalize_deep_dive_card
+INFO_LABEL = "information_deep_dive"
+UTIL_LABEL = "utilities_deep_dive"
+INFO_BATCH = f"v36_deep_dive_{INFO_LABEL}"
+UTIL_BATCH = f"v36_deep_dive_{UTIL_LABEL}"
+NEW_BATCHES = frozenset((INFO_BATCH, UTIL_BATCH))
+
 # Composite formula weights
 WEIGHTS = {"SN": 25, "FA": 25, "EC": 20, "TG": 15, "CE": 15}
 
@@ -231,21 +240,18 @@ def main():
 
     # ── Load existing inventory ──────────────────────────────────────────
     print("Loading existing inventory...")
-    with open(EXISTING_FILE) as f:
-        existing_data = json.load(f)
+    existing_data = json.loads(EXISTING_FILE.read_bytes())
     existing_models = existing_data["models"]
     print(f"  Loaded {len(existing_models)} existing models from {EXISTING_FILE.name}")
 
     # ── Load deep dive files ─────────────────────────────────────────────
     print("Loading Information sector deep dive...")
-    with open(INFO_FILE) as f:
-        info_data = json.load(f)
+    info_data = json.loads(INFO_FILE.read_bytes())
     info_cards = info_data["model_cards"]
     print(f"  Loaded {len(info_cards)} Information cards")
 
     print("Loading Utilities sector deep dive...")
-    with open(UTIL_FILE) as f:
-        util_data = json.load(f)
+    util_data = json.loads(UTIL_FILE.read_bytes())
     util_cards = util_data["model_cards"]
     print(f"  Loaded {len(util_cards)} Utilities cards")
 
@@ -279,7 +285,7 @@ def main():
     composite_diffs = []
 
     for card in info_cards:
-        model, stated, recalc = normalize_deep_dive_card(card, "information_deep_dive")
+        model, stated, recalc = normalize_deep_dive_card(card, INFO_LABEL)
         new_models.append(model)
         if stated is not None:
             diff = abs(stated - recalc)
@@ -288,7 +294,7 @@ def main():
                 print(f"  {model['id']}: stated={stated}, recalculated={recalc}, diff={diff:.2f}")
 
     for card in util_cards:
-        model, stated, recalc = normalize_deep_dive_card(card, "utilities_deep_dive")
+        model, stated, recalc = normalize_deep_dive_card(card, UTIL_LABEL)
         new_models.append(model)
         if stated is not None:
             diff = abs(stated - recalc)
@@ -328,13 +334,11 @@ def main():
     print(f"  Total models: {len(all_models)}")
 
     # ── Apply category hard-enforcement to NEW models only ────────────────
-    # Existing 325 models keep their manually-validated categories
+    # Existing 325 models keep their manually-validated categories.
+    # new_models shares its dicts with all_models, so in-place edits carry over.
     print("Applying category hard-enforcement to 20 new models only...")
-    new_ids = {m["id"] for m in new_models}
     enforcement_changes = []
-    for m in all_models:
-        if m["id"] not in new_ids:
-            continue  # preserve existing categories
+    for m in new_models:
         old_primary = m.get("primary_category") or (m["category"][0] if m["category"] else "PARKED")
         old_cats = m["category"] if isinstance(m["category"], list) else [m["category"]]
 
@@ -373,8 +377,17 @@ def main():
     all_models.sort(key=lambda m: (-m["composite"], m["id"]))
 
     # ── Re-rank 1 through N ──────────────────────────────────────────────
+    # Also bucket the new Information / Utilities cards (in rank order) for
+    # the placement report, so it doesn't rescan all_models per section.
+    info_placed = []
+    util_placed = []
     for i, m in enumerate(all_models, 1):
         m["rank"] = i
+        sb = m.get("source_batch")
+        if sb == INFO_BATCH:
+            info_placed.append(m)
+        elif sb == UTIL_BATCH:
+            util_placed.append(m)
 
     # ── Compute summary stats ────────────────────────────────────────────
     composites = [m["composite"] for m in all_models]
@@ -472,17 +485,14 @@ def main():
             "source_batch_counts": dict(sorted(source_counts.items())),
         },
         "top_50": top_50,
-        "models": all_models,
     }
 
     # ── Write normalized output ──────────────────────────────────────────
     print(f"Writing {len(all_models)} models to {OUTPUT_FILE.name}...")
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    dump_json_streaming(output, all_models, OUTPUT_FILE, ensure_ascii=False)
 
     # ── Write UI models.json ─────────────────────────────────────────────
     print(f"Writing UI models.json ({len(all_models)} models)...")
-    ui_models = [build_slim_model(m) for m in all_models]
     ui_output = {
         "cycle": "v3-7",
         "date": "2026-02-12",
@@ -498,16 +508,14 @@ def main():
             "all_category_distribution": dict(sorted(all_cat_dist.items())),
             "source_batch_counts": dict(sorted(source_counts.items())),
         },
-        "models": ui_models,
     }
-    with open(UI_OUTPUT, "w") as f:
-        json.dump(ui_output, f, indent=2, ensure_ascii=False)
+    dump_json_streaming(ui_output, (build_slim_model(m) for m in all_models), UI_OUTPUT,
+                        ensure_ascii=False)
 
     # ── Validate output ──────────────────────────────────────────────────
     print()
     print("Validating output...")
-    with open(OUTPUT_FILE) as f:
-        validated = json.load(f)
+    validated = json.loads(OUTPUT_FILE.read_bytes())
 
     expected_total = 325 + total_new
     assert len(validated["models"]) == expected_total, \
@@ -535,8 +543,7 @@ def main():
     assert len(output_ids) == len(set(output_ids)), "Duplicate IDs found in output!"
 
     # Validate UI output
-    with open(UI_OUTPUT) as f:
-        ui_validated = json.load(f)
+    ui_validated = json.loads(UI_OUTPUT.read_bytes())
     assert len(ui_validated["models"]) == expected_total, \
         f"UI models.json: expected {expected_total}, got {len(ui_validated['models'])}"
 
@@ -579,26 +586,24 @@ def main():
     # Top 15
     print("  Top 15 models:")
     for m in all_models[:15]:
-        flag = " [NEW]" if "deep_dive_information" in (m.get("source_batch") or "") or \
-                           "deep_dive_utilities" in (m.get("source_batch") or "") else ""
-        v36 = " [v36]" if m.get("new_in_v36") and not flag else ""
+        is_new = m.get("source_batch") in NEW_BATCHES
+        flag = " [NEW]" if is_new else ""
+        v36 = " [v36]" if not is_new and m.get("new_in_v36") else ""
         print(f"    {m['rank']:3d}. {m['composite']:6.2f}  {m['primary_category']:<22s}  "
               f"{m['id']:<20s}  {m['name'][:45]}{flag}{v36}")
     print()
 
     # New cards placement
     print("  New Information cards placement:")
-    for m in all_models:
-        if "information_deep_dive" in (m.get("source_batch") or ""):
-            print(f"    {m['rank']:3d}. {m['composite']:6.2f}  {m['primary_category']:<22s}  "
-                  f"{m['id']:<16s}  {m['name'][:50]}")
+    for m in info_placed:
+        print(f"    {m['rank']:3d}. {m['composite']:6.2f}  {m['primary_category']:<22s}  "
+              f"{m['id']:<16s}  {m['name'][:50]}")
     print()
 
     print("  New Utilities cards placement:")
-    for m in all_models:
-        if "utilities_deep_dive" in (m.get("source_batch") or ""):
-            print(f"    {m['rank']:3d}. {m['composite']:6.2f}  {m['primary_category']:<22s}  "
-                  f"{m['id']:<16s}  {m['name'][:50]}")
+    for m in util_placed:
+        print(f"    {m['rank']:3d}. {m['composite']:6.2f}  {m['primary_category']:<22s}  "
+              f"{m['id']:<16s}  {m['name'][:50]}")
     print()
 
     print(f"  Output: {OUTPUT_FILE}")
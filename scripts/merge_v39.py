@@ -16,12 +16,14 @@ Produces:
   - updates data/ui/models.json      (slim UI format with dual ranking)
 """
 
-import json
-import statistics
+import math
 import sys
+from bisect import bisect_right
 from collections import Counter
 from pathlib import Path
 
+from json_io import dump_json, dump_json_streaming, load_json
+
 BASE = Path("/Users/mv/Documents/research/data/verified")
 UI_DIR = Path("/Users/mv/Documents/research/data/ui")
 
@@ -48,35 +50,62 @@ AXIS_MAP = {
 }
 
 
+# calc_composite / calc_opp_composite spell out WEIGHTS / CLA_WEIGHTS term by
+# term (same order, so the float result is identical) to skip the generator
+# and per-axis weight lookups. Keep them in sync with the dicts above.
 def calc_composite(scores):
-    return round(sum(scores[axis] * WEIGHTS[axis] for axis in WEIGHTS) / 10, 2)
+    return round((scores["SN"] * 25 + scores["FA"] * 25 + scores["EC"] * 20
+                  + scores["TG"] * 15 + scores["CE"] * 15) / 10, 2)
 
 
 def calc_opp_composite(cla_scores):
-    return round(sum(cla_scores[axis] * CLA_WEIGHTS[axis] for axis in CLA_WEIGHTS) / 10, 2)
+    return round((cla_scores["MO"] * 30 + cla_scores["MA"] * 25
+                  + cla_scores["VD"] * 20 + cla_scores["DV"] * 25) / 10, 2)
+
+
+# Shared stand-in for models without a CLA, so m.get("cla", NO_CLA) doesn't
+# allocate a fresh {} per lookup. Read-only: never assign into it.
+NO_CLA = {}
+
+# Opportunity category bands: label i covers [OPP_THRESHOLDS[i-1], OPP_THRESHOLDS[i])
+OPP_THRESHOLDS = (30, 45, 60, 75)
+OPP_LABELS = ("LOCKED", "FORTIFIED", "CONTESTED", "ACCESSIBLE", "WIDE_OPEN")
+
+# Composite distribution buckets, same convention (ascending)
+COMP_EDGES = (50, 60, 70, 80)
+COMP_BUCKETS = ("below_50", "50_to_60", "60_to_70", "70_to_80", "above_80")
 
 
 def classify_opportunity(opp):
-    if opp >= 75: return "WIDE_OPEN"
-    elif opp >= 60: return "ACCESSIBLE"
-    elif opp >= 45: return "CONTESTED"
-    elif opp >= 30: return "FORTIFIED"
-    else: return "LOCKED"
+    return OPP_LABELS[bisect_right(OPP_THRESHOLDS, opp)]
+
+
+def summary_stats(values):
+    """max/min/mean/median from a single sort, instead of four statistics passes."""
+    ordered = sorted(values)
+    n = len(ordered)
+    mid = n // 2
+    median = ordered[mid] if n % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+    return {
+        "max": ordered[-1],
+        "min": ordered[0],
+        "mean": round(math.fsum(ordered) / n, 2),
+        "median": round(median, 2),
+    }
 
 
 def extract_score(scores_obj, axis_short, axis_long):
-    if axis_short in scores_obj:
-        val = scores_obj[axis_short]
+    val = scores_obj.get(axis_short)
+    if val is not None:
         if isinstance(val, (int, float)):
             return val
         if isinstance(val, dict) and "score" in val:
             return val["score"]
-    if axis_long in scores_obj:
-        val = scores_obj[axis_long]
-        if isinstance(val, dict) and "score" in val:
-            return val["score"]
-        if isinstance(val, (int, float)):
-            return val
+    val = scores_obj.get(axis_long)
+    if isinstance(val, dict) and "score" in val:
+        return val["score"]
+    if isinstance(val, (int, float)):
+        return val
     raise KeyError(f"Cannot find score for {axis_short}/{axis_long} in {list(scores_obj.keys())}")
 
 
@@ -93,20 +122,15 @@ def enforce_category(composite, scores, stated_categories, card):
 
     forces = card.get("forces", card.get("forces_v3", []))
     macro = card.get("macro_source", "") or ""
-    if any("fear" in str(f).lower() or "F5" in str(f) for f in forces) or "fear" in macro.lower():
+    # One str/lower over all forces; "\n" can't complete "F5" or "fear" across entries
+    forces_text = "\n".join(map(str, forces))
+    if "F5" in forces_text or "fear" in forces_text.lower() or "fear" in macro.lower():
         if "FEAR_ECONOMY" in stated_categories or "F5_psychology" in forces:
             enforced.append("FEAR_ECONOMY")
     if "EMERGING_CATEGORY" in stated_categories:
         enforced.append("EMERGING_CATEGORY")
 
-    seen = set()
-    unique = []
-    for c in enforced:
-        if c not in seen:
-            seen.add(c)
-            unique.append(c)
-    enforced = unique
-
+    # Each category above is appended at most once, so no dedup pass is needed
     if not enforced:
         if composite >= 60:
             enforced = ["CONDITIONAL"]
@@ -187,8 +211,18 @@ def normalize_new_card(card):
     return model
 
 
+def default_source_batch(card_file):
+    """source_batch for cards in a deep dive file that doesn't declare one."""
+    stem = card_file.stem.lower()
+    if "manufacturing" in stem:
+        return "v39_deep_dive_manufacturing"
+    if "micro_firm" in stem:
+        return "v39_deep_dive_micro_firm"
+    return "v39_deep_dive"
+
+
 def build_slim_model(m):
-    cla = m.get("cla", {})
+    cla = m.get("cla", NO_CLA)
     return {
         "rank": m["rank"],
         "opportunity_rank": m.get("opportunity_rank"),
@@ -217,26 +251,27 @@ def main():
 
     # Load existing inventory
     print("Loading existing inventory...")
-    with open(EXISTING_FILE) as f:
-        existing_data = json.load(f)
+    # Keep only the pieces of each input we actually use, so the parsed
+    # documents (summaries, deep dive narrative sections) are freed before
+    # the output is built and serialized.
+    existing_data = load_json(EXISTING_FILE)
     existing_models = existing_data["models"]
+    rating_system = existing_data.get("rating_system", {})
+    del existing_data
     print(f"  Loaded {len(existing_models)} existing models")
 
-    existing_ids = {m["id"] for m in existing_models}
+    model_by_id = {m["id"]: m for m in existing_models}
 
     # Load CLA refinements and apply to existing models
     cla_updates = 0
     if CLA_REFINEMENT_FILE.exists():
         print(f"\nLoading CLA refinements from {CLA_REFINEMENT_FILE.name}...")
-        with open(CLA_REFINEMENT_FILE) as f:
-            cla_data = json.load(f)
-        overrides = cla_data.get("overrides", {})
+        overrides = load_json(CLA_REFINEMENT_FILE).get("overrides", {})
         print(f"  Found {len(overrides)} CLA overrides")
 
-        for model in existing_models:
-            mid = model["id"]
-            if mid in overrides:
-                o = overrides[mid]
+        for mid, o in overrides.items():
+            model = model_by_id.get(mid)
+            if model is not None:
                 cla_scores = {"MO": o["MO"], "MA": o["MA"], "VD": o["VD"], "DV": o["DV"]}
                 opp_comp = calc_opp_composite(cla_scores)
                 model["cla"] = {
@@ -255,8 +290,7 @@ def main():
             print(f"\n  SKIP: {card_file.name} not found")
             continue
         print(f"\nLoading {card_file.name}...")
-        with open(card_file) as f:
-            data = json.load(f)
+        data = load_json(card_file)
         cards = []
         if isinstance(data, list):
             cards = data
@@ -287,72 +321,81 @@ def main():
 
         file_source_batch = data.get("source_batch") if isinstance(data, dict) else None
         if not file_source_batch:
-            stem = card_file.stem.lower()
-            if "manufacturing" in stem:
-                file_source_batch = "v39_deep_dive_manufacturing"
-            elif "micro_firm" in stem:
-                file_source_batch = "v39_deep_dive_micro_firm"
-            else:
-                file_source_batch = "v39_deep_dive"
+            file_source_batch = default_source_batch(card_file)
         for c in cards:
-            if "source_batch" not in c:
-                c["source_batch"] = file_source_batch
+            c.setdefault("source_batch", file_source_batch)
         print(f"  Found {len(cards)} cards (source_batch={file_source_batch})")
         all_new_cards.extend(cards)
+        del data, cards
 
     print(f"\nTotal new cards to merge: {len(all_new_cards)}")
 
     # Check for collisions
+    # Single pass: record collisions and drop cards whose id already exists
+    # in the base (duplicates within the new cards are reported but kept)
     collisions = []
     new_ids = set()
+    kept_cards = []
     for card in all_new_cards:
         cid = card.get("id", card.get("card_id", "?"))
-        if cid in existing_ids:
+        in_base = cid in model_by_id
+        if in_base:
             collisions.append(cid)
         if cid in new_ids:
             collisions.append(f"{cid} (duplicate within new)")
         new_ids.add(cid)
+        if not in_base:
+            kept_cards.append(card)
+    all_new_cards = kept_cards
 
     if collisions:
         print(f"  WARNING: {len(collisions)} collision(s): {collisions[:10]}")
-        all_new_cards = [c for c in all_new_cards
-                         if c.get("id", c.get("card_id")) not in existing_ids]
         print(f"  After filtering: {len(all_new_cards)} new cards")
 
     # Normalize new cards
     print("\nNormalizing new cards...")
+    # Report lines are collected and printed in one write per section
     new_models = []
+    lines = []
     for card in all_new_cards:
         model = normalize_new_card(card)
         new_models.append(model)
         cla_info = ""
         if "cla" in model:
             cla_info = f" OPP={model['cla']['composite']:.1f} {model['cla']['category']}"
-        print(f"  {model['id']}: {model['composite']:.2f} {model['primary_category']:<22s}{cla_info}  {model['name'][:45]}")
-
-    # Assign default CLA to new models without one (heuristic fallback)
+        lines.append(f"  {model['id']}: {model['composite']:.2f} {model['primary_category']:<22s}{cla_info}  {model['name'][:45]}")
+    if lines:
+        print("\n".join(lines))
+
+    # Assign default CLA to new models without one (heuristic fallback).
+    # cla_scoring is imported once here rather than at module level, so
+    # importing this script leaves sys.path untouched.
+    try:
+        sys.path.insert(0, str(Path(__file__).parent))
+        from cla_scoring import heuristic_cla, calc_opp_composite as cla_calc, classify_opportunity as cla_classify
+        has_cla_scoring = True
+    except ImportError:
+        has_cla_scoring = False
     for model in new_models:
-        if "cla" not in model:
-            # Import heuristic from cla_scoring if available
-            try:
-                sys.path.insert(0, str(Path(__file__).parent))
-                from cla_scoring import heuristic_cla, calc_opp_composite as cla_calc, classify_opportunity as cla_classify
-                mo, ma, vd, dv, rationale = heuristic_cla(model)
-                opp = cla_calc(mo, ma, vd, dv)
-                model["cla"] = {
-                    "scores": {"MO": mo, "MA": ma, "VD": vd, "DV": dv},
-                    "composite": opp,
-                    "category": cla_classify(opp),
-                    "rationale": rationale,
-                }
-            except ImportError:
-                # Fallback: use architecture-based defaults
-                model["cla"] = {
-                    "scores": {"MO": 5, "MA": 5, "VD": 5, "DV": 5},
-                    "composite": 50.0,
-                    "category": "CONTESTED",
-                    "rationale": "Default — no CLA assessment available",
-                }
+        if "cla" in model:
+            continue
+        if has_cla_scoring:
+            mo, ma, vd, dv, rationale = heuristic_cla(model)
+            opp = cla_calc(mo, ma, vd, dv)
+            model["cla"] = {
+                "scores": {"MO": mo, "MA": ma, "VD": vd, "DV": dv},
+                "composite": opp,
+                "category": cla_classify(opp),
+                "rationale": rationale,
+            }
+        else:
+            # Fallback: use architecture-based defaults
+            model["cla"] = {
+                "scores": {"MO": 5, "MA": 5, "VD": 5, "DV": 5},
+                "composite": 50.0,
+                "category": "CONTESTED",
+                "rationale": "Default — no CLA assessment available",
+            }
 
     # Merge
     all_models = existing_models + new_models
@@ -360,50 +403,41 @@ def main():
 
     # Sort by composite descending (Transformation Rank)
     all_models.sort(key=lambda m: (-m["composite"], m["id"]))
+
+    # Assign ranks, pull the two score columns (in rank order) and tally the
+    # category/source distributions in one pass; the opportunity ranking and
+    # all stats below work off these.
+    composites = []
+    opp_composites = []
+    primary_cat_dist = Counter()
+    opp_cat_dist = Counter()
+    source_counts = Counter()
     for i, m in enumerate(all_models, 1):
         m["rank"] = i
+        composites.append(m["composite"])
+        cla = m.get("cla", NO_CLA)
+        opp_composites.append(cla.get("composite", 0))
+        if "primary_category" in m:
+            primary_cat_dist[m["primary_category"]] += 1
+        else:
+            cats = m["category"]
+            primary_cat_dist[cats[0] if isinstance(cats, list) and cats else "PARKED"] += 1
+        opp_cat_dist[cla.get("category", "?")] += 1
+        source_counts[m.get("source_batch", "unknown")] += 1
 
-    # Sort by OPP composite for Opportunity Rank
-    models_by_opp = sorted(all_models, key=lambda m: (-m.get("cla", {}).get("composite", 0), m["id"]))
-    for i, m in enumerate(models_by_opp, 1):
-        m["opportunity_rank"] = i
-
-    # Re-sort by transformation rank for output
-    all_models.sort(key=lambda m: m["rank"])
+    # Opportunity Rank: argsort the OPP column; all_models stays in transformation order
+    opp_order = sorted(range(len(all_models)), key=lambda i: (-opp_composites[i], all_models[i]["id"]))
+    for rank, i in enumerate(opp_order, 1):
+        all_models[i]["opportunity_rank"] = rank
 
     # Compute stats
-    composites = [m["composite"] for m in all_models]
-    composite_stats = {
-        "max": max(composites),
-        "min": min(composites),
-        "mean": round(statistics.mean(composites), 2),
-        "median": round(statistics.median(composites), 2),
-    }
+    composite_stats = summary_stats(composites)
+    opp_stats = summary_stats(opp_composites)
 
-    opp_composites = [m.get("cla", {}).get("composite", 0) for m in all_models]
-    opp_stats = {
-        "max": max(opp_composites),
-        "min": min(opp_composites),
-        "mean": round(statistics.mean(opp_composites), 2),
-        "median": round(statistics.median(opp_composites), 2),
-    }
-
-    primary_cat_dist = Counter(
-        m.get("primary_category", m["category"][0] if isinstance(m["category"], list) and m["category"] else "PARKED")
-        for m in all_models
-    )
-
-    opp_cat_dist = Counter(m.get("cla", {}).get("category", "?") for m in all_models)
-
-    comp_dist = {
-        "above_80": sum(1 for c in composites if c >= 80),
-        "70_to_80": sum(1 for c in composites if 70 <= c < 80),
-        "60_to_70": sum(1 for c in composites if 60 <= c < 70),
-        "50_to_60": sum(1 for c in composites if 50 <= c < 60),
-        "below_50": sum(1 for c in composites if c < 50),
-    }
-
-    source_counts = Counter(m.get("source_batch", "unknown") for m in all_models)
+    bucket_counts = [0] * len(COMP_BUCKETS)
+    for c in composites:
+        bucket_counts[bisect_right(COMP_EDGES, c)] += 1
+    comp_dist = dict(zip(reversed(COMP_BUCKETS), reversed(bucket_counts)))  # highest bucket first
 
     new_count = len(new_models)
 
@@ -420,7 +454,7 @@ def main():
             f"{cla_updates} CLA refinements applied to existing models. "
             f"All {len(all_models)} models sorted by composite, re-ranked on both dimensions."
         ),
-        "rating_system": existing_data.get("rating_system", {}),
+        "rating_system": rating_system,
         "summary": {
             "total_models": len(all_models),
             "existing_models": len(existing_models),
@@ -438,22 +472,19 @@ def main():
 
     # Write full output
     print(f"\nWriting {len(all_models)} models to {OUTPUT_FILE.name}...")
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    dump_json(output, OUTPUT_FILE, ensure_ascii=False)
 
     # Write UI models.json
     print("Writing UI models.json...")
-    ui_models = [build_slim_model(m) for m in all_models]
     ui_output = {
         "cycle": "v3-9",
         "date": "2026-02-12",
         "total": len(all_models),
         "dual_ranking": True,
         "summary": output["summary"],
-        "models": ui_models,
     }
-    with open(UI_OUTPUT, "w") as f:
-        json.dump(ui_output, f, indent=2, ensure_ascii=False)
+    dump_json_streaming(ui_output, (build_slim_model(m) for m in all_models), UI_OUTPUT,
+                        ensure_ascii=False)
 
     # Print summary
     print()
@@ -468,38 +499,45 @@ def main():
     print(f"  Opportunity:    max={opp_stats['max']}, mean={opp_stats['mean']}, median={opp_stats['median']}")
     print()
 
-    print("  Top 20 by TRANSFORMATION (with Opportunity Rank):")
-    print(f"  {'T#':>3s}  {'O#':>3s}  {'TComp':>6s}  {'OComp':>6s}  {'TCat':<22s}  {'OCat':<12s}  Name")
+    lines = [
+        "  Top 20 by TRANSFORMATION (with Opportunity Rank):",
+        f"  {'T#':>3s}  {'O#':>3s}  {'TComp':>6s}  {'OComp':>6s}  {'TCat':<22s}  {'OCat':<12s}  Name",
+    ]
     for m in all_models[:20]:
-        opp_c = m.get("cla", {}).get("composite", 0)
-        opp_cat = m.get("cla", {}).get("category", "?")
-        print(f"  {m['rank']:3d}  {m.get('opportunity_rank', 0):3d}  "
-              f"{m['composite']:6.2f}  {opp_c:6.2f}  "
-              f"{m.get('primary_category', '?'):<22s}  {opp_cat:<12s}  "
-              f"{m['name'][:45]}")
-    print()
-
-    print("  Top 20 ACTIONABLE (geometric mean):")
+        cla = m.get("cla", NO_CLA)
+        opp_c = cla.get("composite", 0)
+        opp_cat = cla.get("category", "?")
+        lines.append(f"  {m['rank']:3d}  {m.get('opportunity_rank', 0):3d}  "
+                     f"{m['composite']:6.2f}  {opp_c:6.2f}  "
+                     f"{m.get('primary_category', '?'):<22s}  {opp_cat:<12s}  "
+                     f"{m['name'][:45]}")
+    lines.append("")
+    print("\n".join(lines))
+
+    lines = ["  Top 20 ACTIONABLE (geometric mean):"]
     actionable = sorted(all_models,
-        key=lambda m: -(m["composite"] * m.get("cla", {}).get("composite", 1)) ** 0.5)
+        key=lambda m: -(m["composite"] * m.get("cla", NO_CLA).get("composite", 1)) ** 0.5)
     for m in actionable[:20]:
-        opp_c = m.get("cla", {}).get("composite", 0)
+        opp_c = m.get("cla", NO_CLA).get("composite", 0)
         geo = (m["composite"] * opp_c) ** 0.5 if opp_c > 0 else 0
-        print(f"  {geo:6.2f}  T#{m['rank']:3d}  O#{m.get('opportunity_rank', 0):3d}  "
-              f"TC={m['composite']:5.1f}  OC={opp_c:5.1f}  "
-              f"{m['id']:<30s}  {m['name'][:40]}")
-    print()
+        lines.append(f"  {geo:6.2f}  T#{m['rank']:3d}  O#{m.get('opportunity_rank', 0):3d}  "
+                     f"TC={m['composite']:5.1f}  OC={opp_c:5.1f}  "
+                     f"{m['id']:<30s}  {m['name'][:40]}")
+    lines.append("")
+    print("\n".join(lines))
 
     # New v3-9 cards placement
-    print("  New v3-9 cards placement:")
+    lines = ["  New v3-9 cards placement:"]
     for m in all_models:
         if m.get("source_batch", "").startswith("v39_"):
-            opp_c = m.get("cla", {}).get("composite", 0)
-            opp_cat = m.get("cla", {}).get("category", "?")
-            print(f"    T#{m['rank']:3d}  O#{m.get('opportunity_rank', 0):3d}  "
-                  f"TC={m['composite']:5.1f}  OC={opp_c:5.1f}  {opp_cat:<12s}  "
-                  f"{m['id']:<30s}  {m['name'][:40]}")
-    print()
+            cla = m.get("cla", NO_CLA)
+            opp_c = cla.get("composite", 0)
+            opp_cat = cla.get("category", "?")
+            lines.append(f"    T#{m['rank']:3d}  O#{m.get('opportunity_rank', 0):3d}  "
+                         f"TC={m['composite']:5.1f}  OC={opp_c:5.1f}  {opp_cat:<12s}  "
+                         f"{m['id']:<30s}  {m['name'][:40]}")
+    lines.append("")
+    print("\n".join(lines))
     print(f"  Output: {OUTPUT_FILE}")
     print(f"  UI:     {UI_OUTPUT}")
 
@@ -17,11 +17,12 @@ Rename patterns:
 Audit trail written to data/cache/v315_naming_audit.json
 """
 
-import json
 import re
 import sys
 from pathlib import Path
 
+from json_io import dump_json, load_json
+
 BASE = Path("/Users/mv/Documents/research/data/verified")
 NORMALIZED_FILE = BASE / "v3-12_normalized_2026-02-12.json"
 CACHE_DIR = Path("/Users/mv/Documents/research/data/cache")
@@ -54,13 +55,32 @@ KEEP_PATTERNS = [
 ]
 
 
+# Fused KEEP_PATTERNS check: one regex scan instead of a Python loop per name.
+# Patterns are lowercased here once; names are lowercased once per check, which
+# is cheaper than re.IGNORECASE folding every character during the scan.
+KEEP_RE = re.compile("|".join(re.escape(p.lower()) for p in KEEP_PATTERNS))
+
+# "AI-<Modifier> X" prefixes (patterns 1-7) → (replacement word, rule name)
+PREFIX_RULES = {
+    "Native": ("Autonomous", "AI-Native→Autonomous"),
+    "Powered": ("Intelligent", "AI-Powered→Intelligent"),
+    "Enhanced": ("Smart", "AI-Enhanced→Smart"),
+    "Driven": ("Algorithmic", "AI-Driven→Algorithmic"),
+    "Optimized": ("Optimized", "AI-Optimized→Optimized"),
+    "Enabled": ("Automated", "AI-Enabled→Automated"),
+    "Integrated": ("Integrated", "AI-Integrated→Integrated"),
+}
+PREFIX_RE = re.compile(r"^AI-(" + "|".join(PREFIX_RULES) + r")\s+(.+)$")
+GENERIC_AI_RE = re.compile(r"^AI\s+(.+)$")
+
+# Adjective-like openers after a generic "AI " prefix, where "AI" is redundant
+VERB_STARTS = ("Predictive", "Automated", "Smart", "Digital", "Autonomous",
+               "Real-Time", "Dynamic", "Personalized", "Adaptive")
+
+
 def should_keep_ai(name):
     """Check if 'AI' is the product identity and should be kept."""
-    name_lower = name.lower()
-    for pattern in KEEP_PATTERNS:
-        if pattern.lower() in name_lower:
-            return True
-    return False
+    return KEEP_RE.search(name.lower()) is not None
 
 
 def rename_model(name):
@@ -72,51 +92,19 @@ def rename_model(name):
     if "AI" not in name and "ai" not in name.split("-")[0]:
         return name, None
 
-    # Pattern 1: "AI-Native X" → "Autonomous X"
-    m = re.match(r"^AI-Native\s+(.+)$", name)
-    if m:
-        return f"Autonomous {m.group(1)}", "AI-Native→Autonomous"
-
-    # Pattern 2: "AI-Powered X" → "Intelligent X"
-    m = re.match(r"^AI-Powered\s+(.+)$", name)
-    if m:
-        return f"Intelligent {m.group(1)}", "AI-Powered→Intelligent"
-
-    # Pattern 3: "AI-Enhanced X" → "Smart X"
-    m = re.match(r"^AI-Enhanced\s+(.+)$", name)
-    if m:
-        return f"Smart {m.group(1)}", "AI-Enhanced→Smart"
-
-    # Pattern 4: "AI-Driven X" → "Algorithmic X"
-    m = re.match(r"^AI-Driven\s+(.+)$", name)
-    if m:
-        return f"Algorithmic {m.group(1)}", "AI-Driven→Algorithmic"
-
-    # Pattern 5: "AI-Optimized X" → "Optimized X"
-    m = re.match(r"^AI-Optimized\s+(.+)$", name)
-    if m:
-        return f"Optimized {m.group(1)}", "AI-Optimized→Optimized"
-
-    # Pattern 6: "AI-Enabled X" → "Automated X"
-    m = re.match(r"^AI-Enabled\s+(.+)$", name)
-    if m:
-        return f"Automated {m.group(1)}", "AI-Enabled→Automated"
-
-    # Pattern 7: "AI-Integrated X" → "Integrated X"
-    m = re.match(r"^AI-Integrated\s+(.+)$", name)
+    # Patterns 1-7: "AI-Native X" → "Autonomous X", "AI-Powered X" → "Intelligent X", ...
+    m = PREFIX_RE.match(name)
     if m:
-        return f"Integrated {m.group(1)}", "AI-Integrated→Integrated"
+        word, rule = PREFIX_RULES[m.group(1)]
+        return f"{word} {m.group(2)}", rule
 
     # Pattern 8: "AI X" (generic prefix) — context-dependent
-    m = re.match(r"^AI\s+(.+)$", name)
+    m = GENERIC_AI_RE.match(name)
     if m:
         rest = m.group(1)
         # If rest starts with a verb-like word, drop "AI" entirely
-        verb_starts = ["Predictive", "Automated", "Smart", "Digital", "Autonomous",
-                       "Real-Time", "Dynamic", "Personalized", "Adaptive"]
-        for v in verb_starts:
-            if rest.startswith(v):
-                return rest, "AI prefix dropped (redundant with adjective)"
+        if rest.startswith(VERB_STARTS):
+            return rest, "AI prefix dropped (redundant with adjective)"
 
         # If rest is a noun phrase describing the product, rename based on architecture meaning
         return f"Automated {rest}", "AI→Automated"
@@ -139,8 +127,7 @@ def main():
     print(f"Mode: {'APPLY (writing changes)' if apply_mode else 'ANALYZE (read-only)'}")
     print()
 
-    with open(NORMALIZED_FILE) as f:
-        data = json.load(f)
+    data = load_json(NORMALIZED_FILE)
     models = data["models"]
 
     # Count AI-in-name before
@@ -208,8 +195,7 @@ def main():
                 m["name"] = name_map[m["id"]]
 
         # Write normalized file
-        with open(NORMALIZED_FILE, "w") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        dump_json(data, NORMALIZED_FILE, ensure_ascii=False)
         print(f"Written: {NORMALIZED_FILE}")
 
         # Write audit trail
@@ -222,8 +208,7 @@ def main():
             "renames": renames,
             "kept": kept,
         }
-        with open(AUDIT_FILE, "w") as f:
-            json.dump(audit, f, indent=2, ensure_ascii=False)
+        dump_json(audit, AUDIT_FILE, ensure_ascii=False)
         print(f"Audit trail: {AUDIT_FILE}")
 
         # Final verification
@@ -5,13 +5,20 @@ Fixes:
 - 15 blank architecture fields (inferred from sector + one_liner)
 - 44 non-canonical types mapped to 15 canonical
 - Preserves original architecture in `architecture_original` field
+
+Usage: python3 normalize_architecture.py [--compact]
+  --compact  write the corpus without indentation (smaller, faster to parse)
 """
 
-import json
+import sys
+from functools import lru_cache
 from pathlib import Path
 
+from json_io import dump_json, load_json
+
 BASE = Path("/Users/mv/Documents/research/data/verified")
 NORMALIZED_FILE = BASE / "v3-12_normalized_2026-02-12.json"
+UNMAPPED_SHOWN = 20  # unmapped types listed in the report
 
 # ── 15 Canonical Architecture Types ──────────────────────────────────
 CANONICAL = {
@@ -112,13 +119,18 @@ ARCH_MAPPING = {
 
 def infer_architecture(model):
     """Infer architecture for models with blank/missing architecture field."""
-    mid = model.get('id', '')
-    naics = model.get('sector_naics', '')[:2]
-    one_liner = (model.get('one_liner', '') or '').lower()
-    name = (model.get('name', '') or '').lower()
+    get = model.get
+    one_liner = (get('one_liner') or '').lower()
+    defense = 'DEF' in get('id', '') or 'defense' in one_liner
+    return _infer_from_keywords(defense, get('sector_naics', '')[:2], one_liner)
 
+
+# Cached: generated corpora often repeat boilerplate one-liners
+@lru_cache(maxsize=None)
+def _infer_from_keywords(defense, naics, one_liner):
+    """Keyword cascade behind infer_architecture (pure in its arguments)."""
     # Defense with robotics/drone keywords
-    if ('DEF' in mid or 'defense' in one_liner) and any(w in one_liner for w in ['drone', 'robot', 'autonomous', 'uav']):
+    if defense and any(w in one_liner for w in ['drone', 'robot', 'autonomous', 'uav']):
         return 'robotics_automation'
 
     # Compliance keywords
@@ -154,8 +166,7 @@ def main():
     print("v3-13 Architecture Taxonomy Normalization")
     print("=" * 70)
 
-    with open(NORMALIZED_FILE) as f:
-        data = json.load(f)
+    data = load_json(NORMALIZED_FILE)
 
     models = data['models']
     print(f"\nLoaded {len(models)} models")
@@ -173,42 +184,52 @@ def main():
     blanks_fixed = 0
     unmapped = Counter()
 
+    # `after` and `non_canonical` are tallied in the same pass
+    after = Counter()
+    non_canonical = []
+
+    canonical = CANONICAL
+    mapping_get = ARCH_MAPPING.get
     for m in models:
         old_arch = m.get('architecture', '') or ''
 
         if not old_arch:
             # Blank → infer
             new_arch = infer_architecture(m)
-            m['architecture_original'] = ''
-            m['architecture'] = new_arch
             blanks_fixed += 1
-            changes += 1
-        elif old_arch in CANONICAL:
+        elif old_arch in canonical:
             # Already canonical → no change
-            pass
-        elif old_arch in ARCH_MAPPING:
-            # Known mapping
-            m['architecture_original'] = old_arch
-            m['architecture'] = ARCH_MAPPING[old_arch]
-            changes += 1
+            after[old_arch] += 1
+            continue
         else:
-            # Unknown type — flag it
-            unmapped[old_arch] += 1
-            # Default to vertical_saas as safest catch-all
-            m['architecture_original'] = old_arch
-            m['architecture'] = 'vertical_saas'
-            changes += 1
+            # Known mapping: one probe instead of a membership test plus a lookup
+            new_arch = mapping_get(old_arch)
+            if new_arch is None:
+                # Unknown type — flag it
+                unmapped[old_arch] += 1
+                # Default to vertical_saas as safest catch-all
+                new_arch = 'vertical_saas'
+
+        # Blank and remapped models share one write path (old_arch is '' for blanks)
+        m['architecture_original'] = old_arch
+        m['architecture'] = new_arch
+        changes += 1
+        after[new_arch] += 1
+        if new_arch not in canonical:
+            non_canonical.append(m['id'])
 
     # Count after
-    after = Counter(m.get('architecture', '') for m in models)
     print(f"\nArchitecture types AFTER: {len(after)}")
     print(f"  Changes made: {changes}")
     print(f"  Blanks fixed: {blanks_fixed}")
 
     if unmapped:
         print(f"\n  WARNING: {len(unmapped)} unmapped types (defaulted to vertical_saas):")
-        for k, v in unmapped.most_common():
+        # most_common(n) selects with heapq.nlargest instead of sorting every key
+        for k, v in unmapped.most_common(UNMAPPED_SHOWN):
             print(f"    {k}: {v}")
+        if len(unmapped) > UNMAPPED_SHOWN:
+            print(f"    ... and {len(unmapped) - UNMAPPED_SHOWN} more")
 
     print(f"\n  Distribution:")
     for arch, count in after.most_common():
@@ -221,15 +242,13 @@ def main():
         print(f"    {arch}: {count}{marker}")
 
     # Verify all canonical
-    non_canonical = [m['id'] for m in models if m.get('architecture', '') not in CANONICAL]
     if non_canonical:
         print(f"\n  ERROR: {len(non_canonical)} models still non-canonical!")
     else:
         print(f"\n  All {len(models)} models have canonical architecture types")
 
     # Save
-    with open(NORMALIZED_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    dump_json(data, NORMALIZED_FILE, compact="--compact" in sys.argv)
     print(f"\n  Saved to {NORMALIZED_FILE}")
 
 
@@ -14,10 +14,20 @@ Steps:
 """
 
 import json
+import math
 import re
 import sys
+from bisect import bisect_left
 from pathlib import Path
 
+from json_io import dump_json_streaming, load_json
+
+try:
+    from rapidfuzz.distance import Levenshtein
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    HAS_RAPIDFUZZ = False
+
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
@@ -60,6 +70,86 @@ for prefix, gap_val in FEAR_FRICTION.items():
     if gap_val > 3:
         FEAR_NAICS_PREFIXES.add(prefix)
 
+FEAR_GAP_RE = re.compile(r"fear_friction_gap\s*=\s*(\d+)")
+
+# ---------------------------------------------------------------------------
+# EC (External Context) modifiers, applied in compute_ec
+# ---------------------------------------------------------------------------
+# Architectures where EC is pinned instead of starting from the GG baseline
+EC_ARCH_OVERRIDE = {
+    "acquire_and_modernize": 5.0,  # US-physical, international irrelevant
+    "rollup_consolidation": 5.0,
+}
+
+# Additive EC modifier by 2-digit NAICS prefix
+EC_SECTOR_DELTA = {
+    "31": 1.0, "32": 1.0, "33": 1.0,  # manufacturing — supply chain / nearshoring
+    "52": 0.5, "54": 0.5,             # financial/compliance — EU AI Act contagion
+    "62": 0.5,                        # healthcare — Japan aging leading indicator
+    "21": 1.0, "22": 1.0,             # energy — geopolitical dynamics
+}
+
+# Additive EC modifier by architecture (non-override)
+EC_ARCH_DELTA = {
+    "regulatory_moat_builder": 1.0,   # EU AI Act opportunity
+    "platform_infrastructure": 0.5,   # portable globally
+    "data_compounding": 0.5,
+}
+
+# ---------------------------------------------------------------------------
+# Rating system block written into the output (v3-4 axes and categories)
+# ---------------------------------------------------------------------------
+RATING_SYSTEM = {
+    "axes": {
+        "SN": {
+            "name": "Structural Necessity",
+            "weight": 0.25,
+            "description": "Must this business exist given structural forces?"
+        },
+        "FA": {
+            "name": "Force Alignment",
+            "weight": 0.25,
+            "description": "How many F1-F6 forces drive it, weighted by velocity?"
+        },
+        "EC": {
+            "name": "External Context",
+            "weight": 0.2,
+            "description": "How much does international context materially change viability vs. US-only assessment?"
+        },
+        "TG": {
+            "name": "Timing Grade",
+            "weight": 0.15,
+            "description": "Perez-aware entry window + crash resilience"
+        },
+        "CE": {
+            "name": "Capital Efficiency",
+            "weight": 0.15,
+            "description": "Revenue-per-dollar, time-to-cashflow, crash survivability"
+        }
+    },
+    "composite_formula": "(SN*25 + FA*25 + EC*20 + TG*15 + CE*15) / 10",
+    "categories": {
+        "STRUCTURAL_WINNER": "SN >= 8.0 AND FA >= 8.0 — must-exist business with multi-force convergence",
+        "FORCE_RIDER": "FA >= 7.0 — rides 3+ converging macro forces (and not STRUCTURAL_WINNER)",
+        "TIMING_ARBITRAGE": "TG >= 8.0 AND SN >= 6.0 — narrow entry window",
+        "CAPITAL_MOAT": "CE >= 8.0 AND SN >= 6.0 — cash-flow positive within 6 months",
+        "FEAR_ECONOMY": "Arises from fear friction: macro_source contains 'fear' or sector fear_friction_gap > 3",
+        "EMERGING_CATEGORY": "Doesn't map to existing NAICS or macro_source contains 'emerging'",
+        "CONDITIONAL": "Composite >= 60 but no other category matched (fallback)",
+        "PARKED": "Composite < 60 (fallback)"
+    },
+    "notes": [
+        "Models can have MULTIPLE categories assigned as a list",
+        "primary_category is the first matched in priority order",
+        "GEOGRAPHIC_PLAY removed — replaced by EC axis, no equivalent category",
+        "Batch normalization applied: v3-2_cycle (SN -1.5, FA -1.5, TG -2.5), new_macro_45 (SN -0.5, FA -0.3, TG -0.5)"
+    ]
+}
+
+# Per-model fields derived once by attach_derived_fields(), read by Steps 2,
+# 4 and 5, and stripped again before the output is written
+DERIVED_KEYS = ("_arch", "_sector_naics", "_prefix2", "_macro_lc", "_forces")
+
 
 def clamp(value, lo=1.0, hi=10.0):
     """Clamp a numeric value to [lo, hi]."""
@@ -70,17 +160,22 @@ def get_naics_prefix2(sector_naics):
     """Extract the 2-digit NAICS prefix from sector_naics field."""
     if not sector_naics:
         return ""
-    # Handle ranges like "31-33"
-    cleaned = str(sector_naics).strip()
-    # Take first 2 digits
-    digits = re.match(r"(\d{2})", cleaned)
-    return digits.group(1) if digits else ""
+    if not isinstance(sector_naics, str):
+        sector_naics = str(sector_naics)
+    # Handle ranges like "31-33": take the first 2 digits. isdecimal() is the
+    # same character class as regex \d, without the regex call
+    prefix = sector_naics.lstrip()[:2]
+    return prefix if len(prefix) == 2 and prefix.isdecimal() else ""
+
 
+def levenshtein_distance(s1, s2, limit=None):
+    """Compute Levenshtein edit distance between two strings.
 
-def levenshtein_distance(s1, s2):
-    """Compute Levenshtein edit distance between two strings."""
+    With `limit`, gives up as soon as the distance must exceed it and
+    returns a value above limit (a row's minimum never decreases later).
+    """
     if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
+        return levenshtein_distance(s2, s1, limit)
     if len(s2) == 0:
         return len(s1)
 
@@ -94,6 +189,8 @@ def levenshtein_distance(s1, s2):
             substitutions = prev_row[j] + (c1 != c2)
             curr_row.append(min(insertions, deletions, substitutions))
         prev_row = curr_row
+        if limit is not None and min(prev_row) > limit:
+            return limit + 1
     return prev_row[-1]
 
 
@@ -104,9 +201,11 @@ def names_are_similar(name1, name2):
       - Levenshtein distance < 15% of the longer name's length, OR
       - One name fully contains the other
     """
-    n1 = name1.lower().strip()
-    n2 = name2.lower().strip()
+    return _normalized_names_similar(name1.lower().strip(), name2.lower().strip())
 
+
+def _normalized_names_similar(n1, n2):
+    """names_are_similar for names already lowercased and stripped."""
     # Containment check
     if n1 in n2 or n2 in n1:
         return True
@@ -116,20 +215,38 @@ def names_are_similar(name1, name2):
     if max_len == 0:
         return True
     threshold = 0.15 * max_len
-    dist = levenshtein_distance(n1, n2)
-    return dist < threshold
+    # Largest integer distance still < threshold; both implementations stop
+    # early (returning cutoff + 1) once the distance exceeds it
+    cutoff = math.ceil(threshold) - 1
+    # The distance is at least the length difference, so skip the DP outright
+    if abs(len(n1) - len(n2)) > cutoff:
+        return False
+    if HAS_RAPIDFUZZ:
+        return Levenshtein.distance(n1, n2, score_cutoff=cutoff) <= cutoff
+    return levenshtein_distance(n1, n2, cutoff) <= cutoff
 
 
 def parse_fear_friction_gap_from_context(key_v3_context):
     """Try to extract fear_friction_gap=N from key_v3_context text."""
     if not key_v3_context:
         return None
-    match = re.search(r"fear_friction_gap\s*=\s*(\d+)", key_v3_context)
+    match = FEAR_GAP_RE.search(key_v3_context)
     if match:
         return int(match.group(1))
     return None
 
 
+def attach_derived_fields(model):
+    """Cache the normalized fields that EC, categories and dedup all use."""
+    sector_naics = str(model.get("sector_naics", ""))
+    model["_arch"] = (model.get("architecture") or "").lower().strip()
+    model["_sector_naics"] = sector_naics
+    model["_prefix2"] = get_naics_prefix2(sector_naics)
+    model["_macro_lc"] = (model.get("macro_source") or "").lower()
+    model["_forces"] = set(model.get("forces_v3", []) or [])
+    return model
+
+
 # ---------------------------------------------------------------------------
 # Step 1: Batch normalization
 # ---------------------------------------------------------------------------
@@ -158,44 +275,26 @@ def compute_ec(model):
     """
     scores = model["scores"]
     gg_baseline = float(scores.get("GG", 5.0))
-    ec = gg_baseline
 
-    architecture = (model.get("architecture") or "").lower().strip()
-    forces = model.get("forces_v3", []) or []
-    sector_naics = str(model.get("sector_naics", ""))
-    prefix2 = get_naics_prefix2(sector_naics)
-    macro_source = (model.get("macro_source") or "").lower()
+    architecture = model["_arch"]
+    forces = model["_forces"]
+    macro_source = model["_macro_lc"]
 
     # Architecture overrides
-    if architecture in ("acquire_and_modernize", "rollup_consolidation"):
-        ec = 5.0  # US-physical, international irrelevant
+    ec = EC_ARCH_OVERRIDE.get(architecture, gg_baseline)
 
     # Force-based modifiers
     if "F3" in forces:
         ec += 1.5  # geopolitics directly relevant
 
     # Sector-based modifiers
-    if prefix2 in ("31", "32", "33"):
-        ec += 1.0  # manufacturing — supply chain / nearshoring
-
-    if prefix2 in ("52", "54"):
-        ec += 0.5  # financial/compliance — EU AI Act contagion
-
-    if prefix2 == "62":
-        ec += 0.5  # healthcare — Japan aging leading indicator
+    ec += EC_SECTOR_DELTA.get(model["_prefix2"], 0.0)
 
     if "defense" in macro_source:
         ec += 2.0  # inherently international
 
-    if prefix2 in ("21", "22"):
-        ec += 1.0  # energy — geopolitical dynamics
-
     # Architecture-based modifiers (non-override)
-    if architecture == "regulatory_moat_builder":
-        ec += 1.0  # EU AI Act opportunity
-
-    if architecture in ("platform_infrastructure", "data_compounding"):
-        ec += 0.5  # portable globally
+    ec += EC_ARCH_DELTA.get(architecture, 0.0)
 
     # Force-based demographic modifier
     if "F2" in forces:
@@ -243,10 +342,9 @@ def assign_categories(model):
     tg = float(scores.get("TG", 0))
     ce = float(scores.get("CE", 0))
 
-    forces = model.get("forces_v3", []) or []
-    sector_naics = str(model.get("sector_naics", ""))
-    prefix2 = get_naics_prefix2(sector_naics)
-    macro_source = (model.get("macro_source") or "").lower()
+    sector_naics = model["_sector_naics"]
+    prefix2 = model["_prefix2"]
+    macro_source = model["_macro_lc"]
     key_v3_context = model.get("key_v3_context") or ""
 
     categories = []
@@ -330,10 +428,7 @@ def deduplicate_models(models):
 
     groups = defaultdict(list)
     for model in models:
-        arch = (model.get("architecture") or "").lower().strip()
-        prefix2 = get_naics_prefix2(model.get("sector_naics", ""))
-        key = (arch, prefix2)
-        groups[key].append(model)
+        groups[(model["_arch"], model["_prefix2"])].append(model)
 
     kept = []
     total_merged = 0
@@ -347,21 +442,28 @@ def deduplicate_models(models):
             kept.extend(group)
             continue
 
-        # Find clusters of name-similar models
-        used = [False] * len(group)
+        # Find clusters of name-similar models. Identical normalized names
+        # always end up in the same cluster, so compare each distinct name
+        # once (in first-appearance order) and expand to its members after
+        members = {}
+        for idx, m in enumerate(group):
+            members.setdefault(m["name"].lower().strip(), []).append(idx)
+        names = list(members)
+        used = [False] * len(names)
         clusters = []
 
-        for i in range(len(group)):
+        for i in range(len(names)):
             if used[i]:
                 continue
-            cluster = [i]
+            cluster = list(members[names[i]])
             used[i] = True
-            for j in range(i + 1, len(group)):
+            for j in range(i + 1, len(names)):
                 if used[j]:
                     continue
-                if names_are_similar(group[i]["name"], group[j]["name"]):
-                    cluster.append(j)
+                if _normalized_names_similar(names[i], names[j]):
+                    cluster.extend(members[names[j]])
                     used[j] = True
+            cluster.sort()  # group order, as the per-model scan produced
             clusters.append(cluster)
 
         for cluster in clusters:
@@ -392,8 +494,7 @@ def main():
         sys.exit(1)
 
     try:
-        with open(INPUT_PATH, "r") as f:
-            data = json.load(f)
+        data = load_json(INPUT_PATH)
     except json.JSONDecodeError as e:
         print(f"ERROR: Failed to parse JSON: {e}", file=sys.stderr)
         sys.exit(1)
@@ -405,9 +506,13 @@ def main():
 
     print(f"Loaded {len(models)} models")
 
+    # Original composites for the delta report, before Step 3 overwrites them
+    orig_by_id = {m["id"]: m["composite"] for m in models}
+
     # Track batch counts for reporting
     batch_counts = {}
     for m in models:
+        attach_derived_fields(m)
         b = m.get("source_batch", "unknown")
         batch_counts[b] = batch_counts.get(b, 0) + 1
     print(f"Batch distribution: {json.dumps(batch_counts, indent=2)}")
@@ -519,56 +624,15 @@ def main():
     # -----------------------------------------------------------------------
     # Build output
     # -----------------------------------------------------------------------
-    # Update rating_system
-    rating_system = {
-        "axes": {
-            "SN": {
-                "name": "Structural Necessity",
-                "weight": 0.25,
-                "description": "Must this business exist given structural forces?"
-            },
-            "FA": {
-                "name": "Force Alignment",
-                "weight": 0.25,
-                "description": "How many F1-F6 forces drive it, weighted by velocity?"
-            },
-            "EC": {
-                "name": "External Context",
-                "weight": 0.2,
-                "description": "How much does international context materially change viability vs. US-only assessment?"
-            },
-            "TG": {
-                "name": "Timing Grade",
-                "weight": 0.15,
-                "description": "Perez-aware entry window + crash resilience"
-            },
-            "CE": {
-                "name": "Capital Efficiency",
-                "weight": 0.15,
-                "description": "Revenue-per-dollar, time-to-cashflow, crash survivability"
-            }
-        },
-        "composite_formula": "(SN*25 + FA*25 + EC*20 + TG*15 + CE*15) / 10",
-        "categories": {
-            "STRUCTURAL_WINNER": "SN >= 8.0 AND FA >= 8.0 — must-exist business with multi-force convergence",
-            "FORCE_RIDER": "FA >= 7.0 — rides 3+ converging macro forces (and not STRUCTURAL_WINNER)",
-            "TIMING_ARBITRAGE": "TG >= 8.0 AND SN >= 6.0 — narrow entry window",
-            "CAPITAL_MOAT": "CE >= 8.0 AND SN >= 6.0 — cash-flow positive within 6 months",
-            "FEAR_ECONOMY": "Arises from fear friction: macro_source contains 'fear' or sector fear_friction_gap > 3",
-            "EMERGING_CATEGORY": "Doesn't map to existing NAICS or macro_source contains 'emerging'",
-            "CONDITIONAL": "Composite >= 60 but no other category matched (fallback)",
-            "PARKED": "Composite < 60 (fallback)"
-        },
-        "notes": [
-            "Models can have MULTIPLE categories assigned as a list",
-            "primary_category is the first matched in priority order",
-            "GEOGRAPHIC_PLAY removed — replaced by EC axis, no equivalent category",
-            "Batch normalization applied: v3-2_cycle (SN -1.5, FA -1.5, TG -2.5), new_macro_45 (SN -0.5, FA -0.3, TG -0.5)"
-        ]
-    }
+    for m in models:
+        for k in DERIVED_KEYS:
+            del m[k]
 
-    # Compute summary stats
+    # Compute summary stats; one sort serves min/max/median and, via bisect,
+    # the distribution buckets (bisect_left counts composites below an edge)
     composites = [m["composite"] for m in models]
+    ordered = sorted(composites)
+    below = {edge: bisect_left(ordered, edge) for edge in (50, 60, 70, 80)}
     summary = {
         "total_models": len(models),
         "deduplicated_from": models_before,
@@ -576,17 +640,17 @@ def main():
         "batch_normalization_applied": True,
         "gg_replaced_with_ec": True,
         "composite_stats": {
-            "max": round(max(composites), 2),
-            "min": round(min(composites), 2),
+            "max": round(ordered[-1], 2),
+            "min": round(ordered[0], 2),
             "mean": round(sum(composites) / len(composites), 2),
-            "median": round(sorted(composites)[len(composites) // 2], 2)
+            "median": round(ordered[len(ordered) // 2], 2)
         },
         "composite_distribution": {
-            "above_80": sum(1 for c in composites if c >= 80),
-            "70_to_80": sum(1 for c in composites if 70 <= c < 80),
-            "60_to_70": sum(1 for c in composites if 60 <= c < 70),
-            "50_to_60": sum(1 for c in composites if 50 <= c < 60),
-            "below_50": sum(1 for c in composites if c < 50),
+            "above_80": len(ordered) - below[80],
+            "70_to_80": below[80] - below[70],
+            "60_to_70": below[70] - below[60],
+            "50_to_60": below[60] - below[50],
+            "below_50": below[50],
         },
         "primary_category_distribution": new_primary_dist,
         "all_category_distribution": new_all_dist,
@@ -612,7 +676,7 @@ def main():
             entry["variant_count"] = m["variant_count"]
         top_50.append(entry)
 
-    # Build output data
+    # Build output data; "models" is streamed in after this envelope
     output = {
         "cycle": "v3-4",
         "date": "2026-02-11",
@@ -623,17 +687,15 @@ def main():
             f"with multi-category assignment, deduplicated. "
             f"{len(models)} models after dedup (from {models_before})."
         ),
-        "rating_system": rating_system,
+        "rating_system": RATING_SYSTEM,
         "summary": summary,
         "top_50": top_50,
-        "models": models,
     }
 
     # Write output
     print(f"\nWriting: {OUTPUT_PATH}")
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    dump_json_streaming(output, models, OUTPUT_PATH, ensure_ascii=False)
 
     file_size = OUTPUT_PATH.stat().st_size
     print(f"Written: {file_size:,} bytes")
@@ -676,12 +738,7 @@ def main():
 
     # Show biggest movers (composite delta)
     print(f"\n  Biggest composite changes (sample):")
-    # We need to compare against original composites. Rebuild mapping by ID.
-    # Re-read original for comparison
-    with open(INPUT_PATH, "r") as f:
-        orig_data = json.load(f)
-    orig_by_id = {m["id"]: m["composite"] for m in orig_data.get("models", [])}
-
+    # Compare against the original composites captured at load
     deltas = []
     for m in models:
         old_c = orig_by_id.get(m["id"])
@@ -15,13 +15,18 @@ Output fields mirror the existing polanyi structure:
   - source: 'sector_proxy_v317'
   - method: 'NAICS sector average from O*NET aggregates'
 
+Usage: python3 polanyi_backfill_v317.py [--compact]
+  --compact  write the corpus without indentation (smaller, faster to parse)
+
 Author: Claude Code (v3-17 backfill)
 Date: 2026-02-13
 """
 
-import json
 import sys
 from collections import Counter, defaultdict
+from functools import lru_cache
+
+from json_io import dump_json, load_json
 
 DATA_FILE = '/Users/mv/Documents/research/data/verified/v3-12_normalized_2026-02-12.json'
 
@@ -54,6 +59,10 @@ SECTOR_AUTOMATION_EXPOSURE = {
 
 ECONOMY_WIDE_AVERAGE = 0.33
 
+# Distinct key lengths in SECTOR_AUTOMATION_EXPOSURE, longest first. Only
+# prefixes of these lengths can match, so they are the only ones probed.
+SECTOR_KEY_LENGTHS = sorted({len(k) for k in SECTOR_AUTOMATION_EXPOSURE}, reverse=True)
+
 
 def find_automation_exposure(naics_str: str) -> tuple:
     """
@@ -62,13 +71,18 @@ def find_automation_exposure(naics_str: str) -> tuple:
 
     Returns (exposure_value, matched_naics_key).
     """
-    naics = str(naics_str).strip()
+    return _lookup_exposure(str(naics_str).strip())
 
+
+@lru_cache(maxsize=None)
+def _lookup_exposure(naics: str) -> tuple:
+    """Cached lookup behind find_automation_exposure (codes recur across models)."""
     # Try from most specific to least specific
-    for length in range(len(naics), 1, -1):
+    for length in SECTOR_KEY_LENGTHS:
         prefix = naics[:length]
-        if prefix in SECTOR_AUTOMATION_EXPOSURE:
-            return SECTOR_AUTOMATION_EXPOSURE[prefix], prefix
+        exposure = SECTOR_AUTOMATION_EXPOSURE.get(prefix)
+        if exposure is not None:
+            return exposure, prefix
 
     # Fallback to economy-wide average
     return ECONOMY_WIDE_AVERAGE, 'economy_avg'
@@ -82,8 +96,7 @@ def main():
 
     # 1. Load data
     print(f"Loading: {DATA_FILE}")
-    with open(DATA_FILE, 'r') as f:
-        data = json.load(f)
+    data = load_json(DATA_FILE)
 
     models = data['models']
     total = len(models)
@@ -91,14 +104,11 @@ def main():
     print()
 
     # 2. Identify models missing Polanyi automation_exposure
-    missing = []
-    has_exposure = 0
-    for m in models:
-        p = m.get('polanyi')
-        if p is not None and p.get('automation_exposure') is not None:
-            has_exposure += 1
-        else:
-            missing.append(m)
+    missing = [
+        m for m in models
+        if (p := m.get('polanyi')) is None or p.get('automation_exposure') is None
+    ]
+    has_exposure = total - len(missing)
 
     print(f"Already have automation_exposure: {has_exposure}")
     print(f"Missing automation_exposure: {len(missing)}")
@@ -151,12 +161,17 @@ def main():
         '92': 'Public Administration',
     }
 
+    # One row per model: collect the block and print it in one call
+    lines = []
     for naics_2 in sorted(sector_summary.keys()):
         entries = sector_summary[naics_2]
         sector_name = NAICS_NAMES.get(naics_2, 'Other')
-        print(f"\n  NAICS {naics_2} -- {sector_name} ({len(entries)} models):")
-        for model_id, naics, exposure, matched_key in entries:
-            print(f"    {model_id:50s} | NAICS {naics:8s} -> matched '{matched_key}' -> exposure={exposure:.2f}")
+        lines.append(f"\n  NAICS {naics_2} -- {sector_name} ({len(entries)} models):")
+        lines.extend(
+            f"    {model_id:50s} | NAICS {naics:8s} -> matched '{matched_key}' -> exposure={exposure:.2f}"
+            for model_id, naics, exposure, matched_key in entries
+        )
+    print('\n'.join(lines))
 
     # Exposure value distribution
     exposures = [m['polanyi']['automation_exposure'] for m in backfilled]
@@ -169,17 +184,13 @@ def main():
 
     # 5. Write back
     print(f"Saving to: {DATA_FILE}")
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    dump_json(data, DATA_FILE, compact='--compact' in sys.argv)
     print("Saved.")
     print()
 
-    # 6. Verify
+    # 6. Verify (the file was just written from `data`, so check it in memory)
     print("Verifying...")
-    with open(DATA_FILE, 'r') as f:
-        verify_data = json.load(f)
-
-    verify_models = verify_data['models']
+    verify_models = models
     verified_count = sum(
         1 for m in verify_models
         if m.get('polanyi') is not None and m['polanyi'].get('automation_exposure') is not None
@@ -3,12 +3,17 @@
 
 Reads cached Polanyi screen results and maps them to models via
 NAICS-to-SOC bridge. Adds `polanyi` field to each model.
+
+Usage: python3 polanyi_enrichment.py [--compact]
+  --compact  write the corpus without indentation (smaller, faster to parse)
 """
 
-import json
 import statistics
+import sys
 from pathlib import Path
 
+from json_io import dump_json, load_json
+
 BASE = Path("/Users/mv/Documents/research/data/verified")
 NORMALIZED_FILE = BASE / "v3-12_normalized_2026-02-12.json"
 CACHE_FILE = Path("/Users/mv/Documents/research/data/cache/onet_polanyi_screen.json")
@@ -44,14 +49,51 @@ NAICS_TO_SOC = {
 }
 
 
+def sector_polanyi(naics, soc_lookup):
+    """Average the screened SOC codes bridged to a 2-digit NAICS sector.
+
+    Returns (avg_automation_exposure, polanyi_dict), or None when no
+    screened occupation maps to the sector.
+    """
+    soc_codes = NAICS_TO_SOC.get(naics, [])
+    if not soc_codes:
+        return None
+
+    # Get Polanyi data for matching SOC codes (filtered once, reused below)
+    relevant = [s for s in soc_codes if s in soc_lookup]
+    matched = [soc_lookup[s] for s in relevant]
+    if not matched:
+        return None
+
+    # Average across matched occupations
+    avg_auto = statistics.mean([x['automation_exposure'] for x in matched])
+    avg_judgment = statistics.mean([x['judgment_premium'] for x in matched])
+    avg_human = statistics.mean([x['human_premium'] for x in matched])
+
+    # Determine dominant category
+    if avg_auto > avg_judgment and avg_auto > avg_human:
+        dominant = 'routine_cognitive'
+    elif avg_judgment > avg_human:
+        dominant = 'nonroutine_cognitive_analytical'
+    else:
+        dominant = 'nonroutine_cognitive_interpersonal'
+
+    return avg_auto, {
+        'automation_exposure': round(avg_auto, 3),
+        'judgment_premium': round(avg_judgment, 3),
+        'human_premium': round(avg_human, 3),
+        'dominant_category': dominant,
+        'relevant_soc_codes': relevant,
+    }
+
+
 def main():
     print("=" * 70)
     print("v3-13 Polanyi Model Enrichment")
     print("=" * 70)
 
     # Load Polanyi screen cache
-    with open(CACHE_FILE) as f:
-        screen = json.load(f)
+    screen = load_json(CACHE_FILE)
 
     # Build SOC → Polanyi lookup
     soc_lookup = {}
@@ -69,71 +111,46 @@ def main():
     print(f"\n  SOC codes in cache: {len(soc_lookup)}")
 
     # Load models
-    with open(NORMALIZED_FILE) as f:
-        data = json.load(f)
+    data = load_json(NORMALIZED_FILE)
 
     models = data['models']
     print(f"  Models to enrich: {len(models)}")
 
     enriched = 0
     skipped = 0
-    sector_stats = {}
+    sector_stats = {}  # 2-digit NAICS -> enriched model count
+    sector_profiles = {}  # 2-digit NAICS -> sector_polanyi() result
 
     for m in models:
         naics = (m.get('sector_naics', '') or '')[:2]
-        soc_codes = NAICS_TO_SOC.get(naics, [])
-
-        if not soc_codes:
-            m['polanyi'] = None
-            skipped += 1
-            continue
+        if naics not in sector_profiles:
+            sector_profiles[naics] = sector_polanyi(naics, soc_lookup)
+        profile = sector_profiles[naics]
 
-        # Get Polanyi data for matching SOC codes
-        matched = [soc_lookup[s] for s in soc_codes if s in soc_lookup]
-        if not matched:
+        if profile is None:
             m['polanyi'] = None
             skipped += 1
             continue
 
-        # Average across matched occupations
-        avg_auto = statistics.mean([x['automation_exposure'] for x in matched])
-        avg_judgment = statistics.mean([x['judgment_premium'] for x in matched])
-        avg_human = statistics.mean([x['human_premium'] for x in matched])
-
-        # Determine dominant category
-        if avg_auto > avg_judgment and avg_auto > avg_human:
-            dominant = 'routine_cognitive'
-        elif avg_judgment > avg_human:
-            dominant = 'nonroutine_cognitive_analytical'
-        else:
-            dominant = 'nonroutine_cognitive_interpersonal'
-
-        m['polanyi'] = {
-            'automation_exposure': round(avg_auto, 3),
-            'judgment_premium': round(avg_judgment, 3),
-            'human_premium': round(avg_human, 3),
-            'dominant_category': dominant,
-            'relevant_soc_codes': [s for s in soc_codes if s in soc_lookup],
-        }
+        # Own copy per model, so later edits to one model don't leak
+        polanyi = dict(profile[1])
+        polanyi['relevant_soc_codes'] = list(polanyi['relevant_soc_codes'])
+        m['polanyi'] = polanyi
         enriched += 1
 
-        # Track sector stats
-        if naics not in sector_stats:
-            sector_stats[naics] = []
-        sector_stats[naics].append(avg_auto)
+        # Track sector stats; every model in a sector shares its average
+        sector_stats[naics] = sector_stats.get(naics, 0) + 1
 
     print(f"\n  Enriched: {enriched}")
     print(f"  Skipped (no SOC match): {skipped}")
 
     print(f"\n  Automation Exposure by Sector (avg):")
     for naics in sorted(sector_stats.keys()):
-        vals = sector_stats[naics]
-        avg = statistics.mean(vals)
-        print(f"    NAICS {naics}: {avg:.3f} ({len(vals)} models)")
+        avg = sector_profiles[naics][0]
+        print(f"    NAICS {naics}: {avg:.3f} ({sector_stats[naics]} models)")
 
     # Save
-    with open(NORMALIZED_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    dump_json(data, NORMALIZED_FILE, compact='--compact' in sys.argv)
     print(f"\n  Saved to {NORMALIZED_FILE}")
 
 
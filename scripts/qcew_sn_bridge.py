@@ -25,15 +25,22 @@ Usage:
     python3 scripts/qcew_sn_bridge.py
     python3 scripts/qcew_sn_bridge.py --year 2023
     python3 scripts/qcew_sn_bridge.py --year 2023 --prior-year 2022 --min-employment 100
+    python3 scripts/qcew_sn_bridge.py --force   # rebuild even if the lookup is up to date
+
+A <output>.stamp file records the inputs of the last build (years,
+min-employment, CSV and script mtimes); when they match, the rebuild is skipped.
 """
 
 import argparse
 import csv
-import json
+import hashlib
+import heapq
 import os
 import sys
 from pathlib import Path
 
+from json_io import dump_json
+
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
@@ -89,6 +96,11 @@ def safe_int(val, default=0):
     """Convert a CSV string value to int, handling empties and commas."""
     if val is None:
         return default
+    try:
+        # Fast path: nearly every QCEW cell is already a plain integer
+        return int(val)
+    except (ValueError, TypeError):
+        pass
     val = str(val).strip().replace(',', '').replace('"', '')
     if val in ('', 'N', 'n'):
         return default
@@ -105,6 +117,10 @@ def safe_float(val, default=0.0):
     """Convert a CSV string value to float."""
     if val is None:
         return default
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        pass
     val = str(val).strip().replace(',', '').replace('"', '')
     if val in ('', 'N', 'n'):
         return default
@@ -114,6 +130,23 @@ def safe_float(val, default=0.0):
         return default
 
 
+def qcew_csv_path(year):
+    """Path of the cached QCEW national CSV for a year."""
+    return CACHE_DIR / f'qcew_national_{year}.csv'
+
+
+def build_stamp(year, prior_year, min_employment):
+    """Fingerprint everything the lookup is derived from.
+
+    Covers the arguments, the mtimes of both QCEW CSVs (or their absence),
+    and this script's own mtime so code changes also force a rebuild.
+    """
+    parts = [str(year), str(prior_year), str(min_employment)]
+    for path in (qcew_csv_path(year), qcew_csv_path(prior_year), Path(__file__)):
+        parts.append(str(path.stat().st_mtime_ns) if path.exists() else 'missing')
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
 def load_qcew_csv(year):
     """Load a cached QCEW national CSV file and return parsed rows.
 
@@ -124,7 +157,7 @@ def load_qcew_csv(year):
         list of dicts (one per CSV row), or empty list if file not found
     """
     year_str = str(year)
-    csv_path = CACHE_DIR / f'qcew_national_{year_str}.csv'
+    csv_path = qcew_csv_path(year_str)
 
     if not csv_path.exists():
         print(f'WARNING: Cache file not found: {csv_path}')
@@ -148,8 +181,8 @@ def filter_private_sector(rows):
     """
     filtered = []
     for row in rows:
-        own_code = row.get('own_code', '').strip().replace('"', '')
-        agglvl = row.get('agglvl_code', '').strip().replace('"', '')
+        own_code = row.get('own_code', '').strip()
+        agglvl = row.get('agglvl_code', '').strip()
 
         if own_code != PRIVATE_OWN_CODE:
             continue
@@ -166,8 +199,8 @@ def get_economy_avg_pay(rows):
     Looks for agglvl_code = '11' (total private sector, national).
     """
     for row in rows:
-        agglvl = row.get('agglvl_code', '').strip().replace('"', '')
-        own_code = row.get('own_code', '').strip().replace('"', '')
+        agglvl = row.get('agglvl_code', '').strip()
+        own_code = row.get('own_code', '').strip()
         if agglvl == '11' and own_code == PRIVATE_OWN_CODE:
             pay = safe_float(row.get('avg_annual_pay'))
             if pay > 0:
@@ -186,8 +219,8 @@ def build_sector_map(rows):
     """
     sector_map = {}
     for row in rows:
-        agglvl = row.get('agglvl_code', '').strip().replace('"', '')
-        code = row.get('industry_code', '').strip().replace('"', '')
+        agglvl = row.get('agglvl_code', '').strip()
+        code = row.get('industry_code', '').strip()
 
         # Skip total private row (we use it only for economy avg pay)
         if agglvl == '11':
@@ -208,7 +241,7 @@ def build_sector_map(rows):
         oty_pay_pct = safe_float(row.get('oty_avg_annual_pay_pct_chg'))
 
         # Industry title from QCEW CSV (may or may not be present)
-        title = row.get('industry_title', '').strip().replace('"', '')
+        title = row.get('industry_title', '').strip()
 
         sector_map[code] = {
             'industry_code': code,
@@ -354,6 +387,10 @@ def main():
         '--output', default=str(OUTPUT_PATH),
         help=f'Output JSON path (default: {OUTPUT_PATH})'
     )
+    parser.add_argument(
+        '--force', action='store_true',
+        help='Rebuild even if the output is up to date with its inputs'
+    )
     args = parser.parse_args()
 
     year = args.year
@@ -370,6 +407,14 @@ def main():
     print('=' * 70)
     print()
 
+    # Skip the rebuild when the inputs match the last successful build
+    stamp = build_stamp(year, prior_year, min_employment)
+    stamp_path = Path(f'{output_path}.stamp')
+    if (not args.force and os.path.exists(output_path) and stamp_path.exists()
+            and stamp_path.read_text().strip() == stamp):
+        print(f'Lookup is up to date: {output_path} (use --force to rebuild)')
+        return
+
     # --- Step 1: Load QCEW data ---
     current_rows = load_qcew_csv(year)
     if not current_rows:
@@ -422,32 +467,52 @@ def main():
 
     # Summary stats
     if lookup:
-        baumol_scores = [v['baumol_score'] for v in lookup.values() if v['baumol_score'] > 0]
-        frag_scores = [v['fragmentation_proxy'] for v in lookup.values() if v['fragmentation_proxy'] > 0]
-        emp_values = [v['employment'] for v in lookup.values() if v['employment'] > 0]
-
-        # Count by depth
+        # Collect every summary figure in a single pass over the lookup
+        baumol_scores = []
+        frag_scores = []
+        emp_values = []
         depth_counts = {}
+        baumol_over_1_5 = baumol_over_1 = 0
+        emp_over_100k = emp_over_1m = 0
         for v in lookup.values():
             d = v.get('naics_depth', 'unknown')
             depth_counts[d] = depth_counts.get(d, 0) + 1
 
+            baumol = v['baumol_score']
+            if baumol > 0:
+                baumol_scores.append(baumol)
+                if baumol > 1.0:
+                    baumol_over_1 += 1
+                    if baumol > 1.5:
+                        baumol_over_1_5 += 1
+
+            if v['fragmentation_proxy'] > 0:
+                frag_scores.append(v['fragmentation_proxy'])
+
+            employment = v['employment']
+            if employment > 0:
+                emp_values.append(employment)
+                if employment > 100000:
+                    emp_over_100k += 1
+                    if employment > 1000000:
+                        emp_over_1m += 1
+
         print(f'\n  By NAICS depth:')
         for depth, count in sorted(depth_counts.items()):
             print(f'    {depth}: {count:,} sectors')
 
         if baumol_scores:
             print(f'\n  Baumol score range: {min(baumol_scores):.3f} - {max(baumol_scores):.3f}')
-            print(f'  Baumol > 1.5 (high stored energy): {sum(1 for b in baumol_scores if b > 1.5)} sectors')
-            print(f'  Baumol > 1.0 (above average): {sum(1 for b in baumol_scores if b > 1.0)} sectors')
+            print(f'  Baumol > 1.5 (high stored energy): {baumol_over_1_5} sectors')
+            print(f'  Baumol > 1.0 (above average): {baumol_over_1} sectors')
 
         if frag_scores:
             print(f'\n  Fragmentation proxy range: {min(frag_scores):.6f} - {max(frag_scores):.6f}')
 
         if emp_values:
             print(f'\n  Total employment covered: {sum(emp_values):,}')
-            print(f'  Sectors with >100K employment: {sum(1 for e in emp_values if e > 100000)}')
-            print(f'  Sectors with >1M employment: {sum(1 for e in emp_values if e > 1000000)}')
+            print(f'  Sectors with >100K employment: {emp_over_100k}')
+            print(f'  Sectors with >1M employment: {emp_over_1m}')
 
     # Build output JSON
     output = {
@@ -496,8 +561,8 @@ def main():
 
     # Write output
     os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2)
+    dump_json(output, output_path)
+    stamp_path.write_text(stamp + '\n')
 
     print(f'\nLookup written to: {output_path}')
 
@@ -505,16 +570,16 @@ def main():
     print('\n' + '=' * 70)
     print('TOP 20 SECTORS BY BAUMOL SCORE (sanity check)')
     print('=' * 70)
-    sorted_sectors = sorted(
+    top_baumol = heapq.nlargest(
+        20,
         lookup.items(),
         key=lambda x: x[1].get('baumol_score', 0),
-        reverse=True,
     )
     print(f'{"NAICS":>6}  {"Baumol":>7}  {"Empl":>10}  {"Estabs":>8}  '
           f'{"FragProxy":>10}  {"EmpGr":>6}  {"WageGr":>6}  '
           f'{"AvgPay":>9}  {"Title"}')
     print('-' * 110)
-    for code, metrics in sorted_sectors[:20]:
+    for code, metrics in top_baumol:
         print(
             f'{code:>6}  '
             f'{metrics["baumol_score"]:>7.3f}  '
@@ -531,15 +596,15 @@ def main():
     print('\n' + '=' * 70)
     print('TOP 20 SECTORS BY FRAGMENTATION (sanity check)')
     print('=' * 70)
-    sorted_frag = sorted(
-        [(c, m) for c, m in lookup.items() if m.get('employment', 0) >= 5000],
+    top_frag = heapq.nlargest(
+        20,
+        ((c, m) for c, m in lookup.items() if m.get('employment', 0) >= 5000),
         key=lambda x: x[1].get('fragmentation_proxy', 0),
-        reverse=True,
     )
     print(f'{"NAICS":>6}  {"FragProxy":>10}  {"Estabs":>8}  {"Empl":>10}  '
           f'{"Baumol":>7}  {"Title"}')
     print('-' * 90)
-    for code, metrics in sorted_frag[:20]:
+    for code, metrics in top_frag:
         print(
             f'{code:>6}  '
             f'{metrics["fragmentation_proxy"]:>10.6f}  '